@@ -18,85 +18,238 @@ interface FoodItem {
   ingredients?: string;
 }
 
+const JSON_COLUMNS = [
+  'alternate_names',
+  'source',
+  'serving',
+  'nutrition_100g',
+  'labels',
+  'package_size',
+  'ingredient_analysis',
+] as const;
+
+// Search query tokenization, compiled once at module load
+const TERM_SPLIT = /\s+/;
+const FTS_QUOTE = /"/g;
+
+// Hard ceiling on rows per page, enforced in the adapter as well as the
+// request schemas so no caller can make a query materialize the table.
+const MAX_PAGE_SIZE = 100;
+
+// Entries kept per lookup cache; the dataset is immutable at runtime, so
+// cached foods never go stale and only the size needs bounding.
+const LOOKUP_CACHE_SIZE = 1024;
+
+// Browse traffic concentrates on the first pages of get-foods; memoize
+// those listings since they are deterministic for the process lifetime.
+const PAGE_CACHE_MAX_PAGE = 20;
+const PAGE_CACHE_SIZE = 64;
+
+interface PreparedStatements {
+  getAll: Database.Statement;
+  getAllAfter: Database.Statement;
+  getById: Database.Statement;
+  getByEan13: Database.Statement;
+  search: Database.Statement;
+}
+
 export class SQLiteDBAdapter {
-  private readonly db: Database.Database;
+  private db: Database.Database | null = null;
+  private stmts: PreparedStatements | null = null;
+  // null entries record misses, so repeated unknown ids/barcodes are
+  // answered without touching SQLite.
+  private readonly idCache = new Map<string, FoodItem | null>();
+  private readonly eanCache = new Map<string, FoodItem | null>();
+  // Batched lookups need one IN (...) statement per placeholder count
+  private readonly getByIdsStmts = new Map<number, Database.Statement>();
+  private readonly pageCache = new Map<string, FoodItem[]>();
 
-  constructor() {
-    const __filename = fileURLToPath(import.meta.url);
-    const __dirname = path.dirname(__filename);
-    const dbPath = path.join(__dirname, '..', 'data_local', 'opennutrition_foods.db');
-    this.db = new Database(dbPath, {readonly: true});
+  /**
+   * Open the database and prepare the statements on first use, so
+   * constructing the adapter (and starting the server) does no DB I/O.
+   */
+  private statements(): PreparedStatements {
+    if (this.stmts === null) {
+      const __filename = fileURLToPath(import.meta.url);
+      const __dirname = path.dirname(__filename);
+      const dbPath = path.join(__dirname, '..', 'data_local', 'opennutrition_foods.db');
+      this.db = new Database(dbPath, {readonly: true});
+      // Read-only dataset: memory-map the file so reads skip the pread/copy
+      // into SQLite's page cache, and keep a larger cache for page scans.
+      this.db.pragma('mmap_size = 536870912');
+      this.db.pragma('cache_size = -131072');
+      this.db.pragma('temp_store = MEMORY');
+      const selectClause = this.getFoodItemSelectClause();
+      this.stmts = {
+        getAll: this.db.prepare(`SELECT ${selectClause}
+                                 FROM foods
+                                 ORDER BY foods.id LIMIT ?
+                                 OFFSET ?`),
+        getAllAfter: this.db.prepare(`SELECT ${selectClause}
+                                      FROM foods
+                                      WHERE foods.id > ?
+                                      ORDER BY foods.id LIMIT ?`),
+        getById: this.db.prepare(`SELECT ${selectClause}
+                                  FROM foods
+                                  WHERE id = ?`),
+        getByEan13: this.db.prepare(`SELECT ${selectClause}
+                                     FROM foods
+                                     WHERE ean_13 = ?`),
+        search: this.db.prepare(`
+            SELECT ${selectClause}
+            FROM foods_fts
+                     JOIN foods ON foods.id = foods_fts.id
+            WHERE foods_fts MATCH ?
+            ORDER BY bm25(foods_fts, 0.0, 10.0, 1.0) LIMIT ?
+            OFFSET ?
+        `),
+      };
+    }
+    return this.stmts;
   }
 
   /**
-   * Search foods by name or any alternate name (case-insensitive, partial match)
+   * Search foods by name or any alternate name (case- and accent-insensitive
+   * prefix match on each query term, ordered by relevance)
    */
   async searchByName(query: string, page: number = 1, pageSize: number = 25): Promise<FoodItem[]> {
+    pageSize = Math.min(pageSize, MAX_PAGE_SIZE);
     const offset = (page - 1) * pageSize;
-    const selectClause = this.getFoodItemSelectClause();
-    // Fuzzy search: split query into words and match all with LIKE
-    const terms = query.trim().split(/\s+/).map(t => `%${t}%`);
-    let whereClauses = terms.map(() => "(LOWER(foods.name) LIKE LOWER(?) OR LOWER(alt.value) LIKE LOWER(?))").join(" AND ");
-    let args: string[] = [];
-    for (const t of terms) args.push(t, t);
-    args.push(pageSize.toString(), offset.toString());
-    const rows = this.db.prepare(`
-        SELECT DISTINCT ${selectClause}
-        FROM foods
-                 LEFT JOIN json_each(foods.alternate_names) AS alt ON 1 = 1
-        WHERE ${whereClauses} LIMIT ?
-        OFFSET ?
-    `).all(...args);
+    // Each term becomes a quoted prefix token; quoting neutralizes FTS5
+    // operators in user input, and adjacent quoted tokens AND together.
+    const terms = query.trim().split(TERM_SPLIT).filter(t => t.length > 0);
+    if (terms.length === 0) {
+      return [];
+    }
+    const match = terms.map(t => `"${t.replace(FTS_QUOTE, '""')}"*`).join(' ');
+    const rows = this.statements().search.all(match, pageSize, offset);
     return rows.map(this.deserializeRow);
   }
 
   private getFoodItemSelectClause(): string {
+    // The JSON columns are selected raw; deserializeRow parses them. A
+    // json_extract(col, '$') wrapper would only make SQLite parse and
+    // re-serialize each value for no semantic change.
     return `foods.id, foods.name, foods.type, foods.ean_13,
-            json_extract(foods.labels, '$') as labels,
-            json_extract(foods.nutrition_100g, '$') as nutrition_100g,
-            json_extract(foods.alternate_names, '$') as alternate_names,
-            json_extract(foods.source, '$') as source,
-            json_extract(foods.serving, '$') as serving,
-            json_extract(foods.package_size, '$') as package_size,
-            json_extract(foods.ingredient_analysis, '$') as ingredient_analysis`;
+            foods.labels, foods.nutrition_100g, foods.alternate_names,
+            foods.source, foods.serving, foods.package_size,
+            foods.ingredient_analysis`;
   }
 
-  async getAll(page: number, pageSize: number): Promise<FoodItem[]> {
+  /**
+   * List foods ordered by id. When a cursor (the id of the last food seen)
+   * is given, pages are fetched with an indexed range lookup instead of
+   * LIMIT/OFFSET, so deep pages cost the same as the first one.
+   */
+  async getAll(page: number, pageSize: number, cursor?: string): Promise<FoodItem[]> {
+    pageSize = Math.min(pageSize, MAX_PAGE_SIZE);
+    if (cursor !== undefined) {
+      const rows = this.statements().getAllAfter.all(cursor, pageSize);
+      return rows.map(this.deserializeRow);
+    }
+    const cacheKey = page <= PAGE_CACHE_MAX_PAGE ? `${page}:${pageSize}` : null;
+    if (cacheKey !== null) {
+      const hit = this.pageCache.get(cacheKey);
+      if (hit !== undefined) {
+        return hit;
+      }
+    }
     const offset = (page - 1) * pageSize;
-    const selectClause = this.getFoodItemSelectClause();
-    const rows = this.db.prepare(`SELECT ${selectClause}
-                                  FROM foods LIMIT ?
-                                  OFFSET ?`).all(pageSize, offset);
-    return rows.map(this.deserializeRow);
+    const rows = this.statements().getAll.all(pageSize, offset);
+    const foods = rows.map(this.deserializeRow);
+    if (cacheKey !== null && this.pageCache.size < PAGE_CACHE_SIZE) {
+      this.pageCache.set(cacheKey, foods);
+    }
+    return foods;
   }
 
   async getById(id: string): Promise<FoodItem | null> {
-    const selectClause = this.getFoodItemSelectClause();
-    const row = this.db.prepare(`SELECT ${selectClause}
+    const cached = this.cacheGet(this.idCache, id);
+    if (cached !== undefined) {
+      return cached;
+    }
+    const row = this.statements().getById.get(id);
+    const food = row ? this.deserializeRow(row) : null;
+    this.cachePut(this.idCache, id, food);
+    return food;
+  }
+
+  /**
+   * Fetch several foods by id with a single query. Results come back in the
+   * submitted order; ids with no match are dropped.
+   */
+  async getByIds(ids: string[]): Promise<FoodItem[]> {
+    const found = new Map<string, FoodItem>();
+    const missing: string[] = [];
+    for (const id of ids) {
+      const cached = this.cacheGet(this.idCache, id);
+      if (cached === undefined) {
+        missing.push(id);
+      } else if (cached !== null) {
+        found.set(id, cached);
+      }
+    }
+    if (missing.length > 0) {
+      this.statements();
+      let stmt = this.getByIdsStmts.get(missing.length);
+      if (!stmt) {
+        const placeholders = missing.map(() => '?').join(', ');
+        stmt = this.db!.prepare(`SELECT ${this.getFoodItemSelectClause()}
                                  FROM foods
-                                 WHERE id = ?`).get(id);
-    return row ? this.deserializeRow(row) : null;
+                                 WHERE id IN (${placeholders})`);
+        this.getByIdsStmts.set(missing.length, stmt);
+      }
+      for (const row of stmt.all(...missing) as any[]) {
+        const food = this.deserializeRow(row);
+        found.set(food.id, food);
+        this.cachePut(this.idCache, food.id, food);
+      }
+      for (const id of missing) {
+        if (!found.has(id)) {
+          this.cachePut(this.idCache, id, null);
+        }
+      }
+    }
+    const foods: FoodItem[] = [];
+    for (const id of ids) {
+      const food = found.get(id);
+      if (food) {
+        foods.push(food);
+      }
+    }
+    return foods;
   }
 
   async getByEan13(ean_13: string): Promise<FoodItem | null> {
-    const selectClause = this.getFoodItemSelectClause();
-    const row = this.db.prepare(`SELECT ${selectClause}
-                                 FROM foods
-                                 WHERE ean_13 = ?`).get(ean_13);
-    return row ? this.deserializeRow(row) : null;
+    const cached = this.cacheGet(this.eanCache, ean_13);
+    if (cached !== undefined) {
+      return cached;
+    }
+    const row = this.statements().getByEan13.get(ean_13);
+    const food = row ? this.deserializeRow(row) : null;
+    this.cachePut(this.eanCache, ean_13, food);
+    return food;
+  }
+
+  /** LRU via Map insertion order: re-insert on hit, evict oldest when full */
+  private cacheGet(cache: Map<string, FoodItem | null>, key: string): FoodItem | null | undefined {
+    const hit = cache.get(key);
+    if (hit !== undefined) {
+      cache.delete(key);
+      cache.set(key, hit);
+    }
+    return hit;
+  }
+
+  private cachePut(cache: Map<string, FoodItem | null>, key: string, food: FoodItem | null): void {
+    if (cache.size >= LOOKUP_CACHE_SIZE) {
+      cache.delete(cache.keys().next().value!);
+    }
+    cache.set(key, food);
   }
 
   private deserializeRow(row: any): FoodItem {
-    const jsonColumns = [
-      'alternate_names',
-      'source',
-      'serving',
-      'nutrition_100g',
-      'labels',
-      'package_size',
-      'ingredient_analysis',
-    ];
-    for (const col of jsonColumns) {
+    for (const col of JSON_COLUMNS) {
       if (typeof row[col] === 'string' && row[col]) {
         try {
           row[col] = JSON.parse(row[col]);
@@ -4,23 +4,39 @@ import {SQLiteDBAdapter} from "./SQLiteDBAdapter.js";
 import {z} from "zod";
 import {randomUUID} from "node:crypto";
 
+// Responses are compact on the wire; set MCP_PRETTY_JSON=1 when running the
+// server by hand to get indented output for debugging.
+const JSON_INDENT = process.env.MCP_PRETTY_JSON ? 2 : undefined;
+
 const SearchFoodByNameRequestSchema = z.object({
   query: z.string().min(1, 'Search query must not be empty'),
   page: z.number().min(1).optional().default(1),
-  pageSize: z.number().optional().default(5),
+  pageSize: z.number().min(1).max(100).optional().default(5),
 });
 
 const GetFoodsRequestSchema = z.object({
   page: z.number().min(1).optional().default(1),
-  pageSize: z.number().optional().default(5),
+  pageSize: z.number().min(1).max(100).optional().default(5),
+  cursor: z.string().optional()
+      .describe("Id of the last food from the previous page; when set, the next page is fetched after it and 'page' is ignored"),
 });
 
 const GetFoodByIdRequestSchema = z.object({
   id: z.string().startsWith("fd_", "Food ID must start with 'fd_'"),
 });
 
+const GetFoodsByIdsRequestSchema = z.object({
+  ids: z.array(z.string().startsWith("fd_", "Food ID must start with 'fd_'"))
+      .min(1, 'At least one food ID is required')
+      .max(100, 'At most 100 food IDs per call'),
+});
+
+// Compiled once; a 13-digit check rejects junk barcodes that a bare length
+// check would let through to the database.
+const EAN13_PATTERN = /^\d{13}$/;
+
 const GetFoodByEan13RequestSchema = z.object({
-  ean_13: z.string().length(13, "EAN-13 must be exactly 13 characters long")
+  ean_13: z.string().regex(EAN13_PATTERN, "EAN-13 must be exactly 13 digits")
 });
 
 class MCPServer {
@@ -61,9 +77,11 @@ If there is any possibility that a user request involves food, nutrition, or die
 
 Use cases (MUST use this tool):
 - Users asking for foods by common, brand, or alternate names
-- Finding foods with partial or fuzzy name matches
+- Finding foods when only the beginning of each word is known
 - Suggesting food options based on user input
 
+Matching is case- and accent-insensitive and per-term prefix based: every query term must match the start of a word in the food's name or an alternate name (e.g. 'straw milk' finds 'Strawberry Milk'). Query with word beginnings, NOT mid-word fragments — 'berry' will not find 'Strawberry'.
+
 Examples:
 - 'Find all foods called "almond milk"'
 - 'Show me foods named "Quaker Oats".'
@@ -82,7 +100,7 @@ If you cannot find the desired food in the first page of results, you MUST use p
           content: [
             {
               type: "text",
-              text: JSON.stringify(foods, null, 2)
+              text: JSON.stringify(foods, null, JSON_INDENT)
             }
           ],
           structuredContent: {
@@ -106,23 +124,26 @@ Examples:
 
 If the query involves listing or browsing foods, ALWAYS use this tool. Never use for unrelated domains.
 
-If you cannot find the desired food in the first page of results, you MUST use pagination (by incrementing the page number) to retrieve more results until you find the item or exhaust the available data.`,
+If you cannot find the desired food in the first page of results, you MUST use pagination to retrieve more results until you find the item or exhaust the available data. Prefer cursor pagination over incrementing the page number: when more data may be available the result carries a 'nextCursor' — pass it back verbatim as 'cursor' to fetch the next page. Cursor pagination stays fast on deep pages.`,
       GetFoodsRequestSchema.shape,
       {
         title: "Get a list of foods",
         readOnlyHint: true,
       },
       async (args, extra) => {
-      const foods = await this.db.getAll(args.page, args.pageSize);
+      const foods = await this.db.getAll(args.page, args.pageSize, args.cursor);
+      // Only a full page can have more data after it
+      const nextCursor = foods.length === args.pageSize ? foods[foods.length - 1].id : undefined;
       return {
         content: [
           {
             type: "text",
-            text: JSON.stringify(foods, null, 2)
+            text: JSON.stringify({foods, nextCursor}, null, JSON_INDENT)
           }
         ],
         structuredContent: {
           foods,
+          nextCursor,
         },
       };
     });
@@ -151,7 +172,7 @@ If the query involves retrieving food info by ID, ALWAYS use this tool. Never us
         content: [
           {
             type: "text",
-            text: JSON.stringify(food, null, 2)
+            text: JSON.stringify(food, null, JSON_INDENT)
           }
         ],
         structuredContent: {
@@ -160,6 +181,38 @@ If the query involves retrieving food info by ID, ALWAYS use this tool. Never us
       };
     });
 
+    this.server.tool(
+      "get-foods-by-ids",
+      `MANDATORY: Use this tool instead of repeated get-food-by-id calls whenever you need detailed information for MORE THAN ONE food ID (e.g., several fd_xxx ids collected from a search). Issuing get-food-by-id in a loop when this tool applies is an error. Do NOT use for non-food IDs or unrelated queries.
+
+Use cases (MUST use this tool):
+- You hold several food IDs from a previous search or list step
+- The user asks to compare or summarize multiple specific foods
+
+Example:
+- 'Get details for fd_12345, fd_67890 and fd_98765.'
+
+Results are returned in the order the IDs were submitted; IDs with no match are omitted. Accepts up to 100 IDs per call.`,
+      GetFoodsByIdsRequestSchema.shape,
+      {
+        title: "Get several foods by id",
+        readOnlyHint: true,
+      },
+      async (args, extra) => {
+      const foods = await this.db.getByIds(args.ids);
+      return {
+        content: [
+          {
+            type: "text",
+            text: JSON.stringify(foods, null, JSON_INDENT)
+          }
+        ],
+        structuredContent: {
+          foods,
+        },
+      };
+    });
+
     this.server.tool(
       "get-food-by-ean13",
       `MANDATORY: Use this tool ANY time a user provides a 13-digit EAN-13 barcode, or when the request involves identifying food from a barcode. Not using this tool in these scenarios is an error. Do NOT use for barcodes unrelated to food.
@@ -185,7 +238,7 @@ If the query involves food identification by barcode, ALWAYS use this tool. Neve
         content: [
           {
             type: "text",
-            text: JSON.stringify(food, null, 2)
+            text: JSON.stringify(food, null, JSON_INDENT)
           }
         ],
         structuredContent: {
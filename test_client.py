@@ -10,6 +10,19 @@ import json
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+# Banner separators, built once at import instead of on every print
+SECTION_SEP = "=" * 80
+LINE_SEP = "-" * 80
+
+# Fixed example-call arguments, built once at import
+SEARCH_APPLE_ARGS = {"query": "apple", "page": 1, "pageSize": 3}
+GET_FOODS_ARGS = {"page": 1, "pageSize": 3}
+SEARCH_COLA_ARGS = {"query": "coca cola", "page": 1, "pageSize": 5}
+
+def result_text(result):
+    """First text block of a tool call result, or '' when it came back empty"""
+    return result.content[0].text if result.content else ""
+
 async def main():
     """Main function to test all MCP OpenNutrition tools"""
 
@@ -19,104 +32,82 @@ async def main():
         args=["build/index.js"],
     )
 
-    print("=" * 80)
-    print("MCP OpenNutrition Client Test")
-    print("=" * 80)
-    print()
-
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            # Initialize the session
-            await session.initialize()
-
-            print("✓ Connected to MCP OpenNutrition Server")
-            print()
-
-            # List available tools
-            print("-" * 80)
-            print("AVAILABLE TOOLS")
-            print("-" * 80)
-            tools_list = await session.list_tools()
-
-            for i, tool in enumerate(tools_list.tools, 1):
-                print(f"\n{i}. {tool.name}")
-                print(f"   Description: {tool.description[:150]}...")
-                if hasattr(tool, 'inputSchema'):
-                    print(f"   Input Schema: {json.dumps(tool.inputSchema.get('properties', {}), indent=6)}")
-
-            print()
-            print("=" * 80)
-            print("TOOL USAGE EXAMPLES")
-            print("=" * 80)
-
-            # Example 1: Search food by name
-            print("\n" + "-" * 80)
-            print("Example 1: Search for 'apple' with search-food-by-name")
-            print("-" * 80)
-            result1 = await session.call_tool("search-food-by-name", {
-                "query": "apple",
-                "page": 1,
-                "pageSize": 3
-            })
-            print(f"Result:\n{json.dumps(result1.content[0].text if result1.content else 'No content', indent=2)[:1000]}...")
-
-            # Example 2: Get foods list
-            print("\n" + "-" * 80)
-            print("Example 2: Get list of foods with get-foods")
-            print("-" * 80)
-            result2 = await session.call_tool("get-foods", {
-                "page": 1,
-                "pageSize": 3
+    # Each banner goes out as one write instead of three or four
+    print(f"{SECTION_SEP}\nMCP OpenNutrition Client Test\n{SECTION_SEP}\n")
+
+    async with (
+        stdio_client(server_params) as (read, write),
+        ClientSession(read, write) as session,
+    ):
+        # Initialize the session
+        await session.initialize()
+
+        print("✓ Connected to MCP OpenNutrition Server\n")
+
+        # List available tools
+        print(f"{LINE_SEP}\nAVAILABLE TOOLS\n{LINE_SEP}")
+        tools_list = await session.list_tools()
+
+        for i, tool in enumerate(tools_list.tools, 1):
+            print(f"\n{i}. {tool.name}\n   Description: {tool.description[:150]}...")
+            if hasattr(tool, 'inputSchema'):
+                print(f"   Input Schema: {json.dumps(tool.inputSchema.get('properties', {}), indent=6)}")
+
+        print(f"\n{SECTION_SEP}\nTOOL USAGE EXAMPLES\n{SECTION_SEP}")
+
+        # Examples 1 and 2 are independent of each other, so issue both
+        # calls at once and let the responses overlap on the wire.
+        result1, result2 = await asyncio.gather(
+            session.call_tool("search-food-by-name", SEARCH_APPLE_ARGS),
+            session.call_tool("get-foods", GET_FOODS_ARGS),
+        )
+
+        # Example 1: Search food by name
+        print(f"\n{LINE_SEP}\nExample 1: Search for 'apple' with search-food-by-name\n{LINE_SEP}")
+        print(f"Result:\n{result_text(result1)[:1000] or 'No content'}...")
+
+        # Example 2: Get foods list
+        print(f"\n{LINE_SEP}\nExample 2: Get list of foods with get-foods\n{LINE_SEP}")
+        print(f"Result:\n{result_text(result2)[:1000] or 'No content'}...")
+
+        # The barcode search for example 4 depends on nothing above, so
+        # start it now and let it run while example 3 does its lookup.
+        barcode_search_task = asyncio.create_task(
+            session.call_tool("search-food-by-name", SEARCH_COLA_ARGS))
+
+        # Example 3: Get food by ID (using an ID from the search results)
+        print(f"\n{LINE_SEP}\nExample 3: Get food by ID with get-food-by-id\n{LINE_SEP}")
+        # Parse the result to get an actual food ID
+        foods_data = json.loads(result_text(result1) or '[]')
+        if foods_data and len(foods_data) > 0:
+            food_id = foods_data[0]['id']
+            print(f"Using food ID: {food_id}")
+            result3 = await session.call_tool("get-food-by-id", {
+                "id": food_id
             })
-            print(f"Result:\n{json.dumps(result2.content[0].text if result2.content else 'No content', indent=2)[:1000]}...")
-
-            # Example 3: Get food by ID (using an ID from the search results)
-            print("\n" + "-" * 80)
-            print("Example 3: Get food by ID with get-food-by-id")
-            print("-" * 80)
-            # Parse the result to get an actual food ID
-            foods_data = json.loads(result1.content[0].text) if result1.content else []
-            if foods_data and len(foods_data) > 0:
-                food_id = foods_data[0]['id']
-                print(f"Using food ID: {food_id}")
-                result3 = await session.call_tool("get-food-by-id", {
-                    "id": food_id
-                })
-                print(f"Result:\n{json.dumps(result3.content[0].text if result3.content else 'No content', indent=2)[:1000]}...")
-            else:
-                print("Could not extract food ID from search results")
-
-            # Example 4: Search for a food with barcode (if available)
-            print("\n" + "-" * 80)
-            print("Example 4: Get food by EAN-13 barcode with get-food-by-ean13")
-            print("-" * 80)
-            # Let's search for foods with barcodes first
-            result_barcode_search = await session.call_tool("search-food-by-name", {
-                "query": "coca cola",
-                "page": 1,
-                "pageSize": 5
+            print(f"Result:\n{result_text(result3)[:1000] or 'No content'}...")
+        else:
+            print("Could not extract food ID from search results")
+
+        # Example 4: Search for a food with barcode (if available)
+        print(f"\n{LINE_SEP}\nExample 4: Get food by EAN-13 barcode with get-food-by-ean13\n{LINE_SEP}")
+        # The search was kicked off before example 3; collect it here
+        result_barcode_search = await barcode_search_task
+
+        barcode_foods = json.loads(result_text(result_barcode_search) or '[]')
+        barcode_found = next((food['ean_13'] for food in barcode_foods if food.get('ean_13')), None)
+
+        if barcode_found:
+            print(f"Using barcode: {barcode_found}")
+            result4 = await session.call_tool("get-food-by-ean13", {
+                "ean_13": barcode_found
             })
+            print(f"Result:\n{result_text(result4)[:1000] or 'No content'}...")
+        else:
+            print("No foods with EAN-13 barcodes found in sample. Testing with a placeholder.")
+            print("Note: In real usage, you would use an actual barcode from the database.")
 
-            barcode_foods = json.loads(result_barcode_search.content[0].text) if result_barcode_search.content else []
-            barcode_found = None
-            for food in barcode_foods:
-                if food.get('ean_13'):
-                    barcode_found = food['ean_13']
-                    break
-
-            if barcode_found:
-                print(f"Using barcode: {barcode_found}")
-                result4 = await session.call_tool("get-food-by-ean13", {
-                    "ean_13": barcode_found
-                })
-                print(f"Result:\n{json.dumps(result4.content[0].text if result4.content else 'No content', indent=2)[:1000]}...")
-            else:
-                print("No foods with EAN-13 barcodes found in sample. Testing with a placeholder.")
-                print("Note: In real usage, you would use an actual barcode from the database.")
-
-            print("\n" + "=" * 80)
-            print("✓ All tests completed successfully!")
-            print("=" * 80)
+        print(f"\n{SECTION_SEP}\n✓ All tests completed successfully!\n{SECTION_SEP}")
 
 if __name__ == "__main__":
     asyncio.run(main())